@@ -3,12 +3,27 @@
 Ultimate SportMonks Fixtures Fetcher
 Automatically discovers and fetches Danish Superliga fixtures with full error handling
 """
+import asyncio
+import hashlib
+import json
+import aiohttp
+import msgspec
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
-import time
+import pyarrow as pa
+import pyarrow.parquet as pq
 import sys
 import argparse
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
 
 # Load API token from environment variable
 API_TOKEN = os.getenv("SPORTMONKS_API_TOKEN")
@@ -18,12 +33,180 @@ if not API_TOKEN:
     sys.exit(1)
 
 API_BASE = "https://api.sportmonks.com/v3/football"
+DENMARK_COUNTRY_ID = 320  # SportMonks country id for Denmark
+MAX_CONCURRENCY = 8  # Max in-flight fixture page requests
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # Transient statuses worth retrying
+PAGE_RETRIES = 5  # Retries per fixture page before giving up
+RETRY_BACKOFF = 0.3  # Base backoff in seconds, doubled on each retry
+
+# Only request the fixture fields parse_fixtures reads. SportMonks v3 takes
+# base fields via `select` and per-relation fields as `include=relation:fields`.
+FIXTURE_FIELDS = {
+    "select": "id,starting_at",
+    "include": "participants:id,name;scores:score,description,participant_id;formations:formation,location",
+}
+
+# Typed views of the /fixtures payload; fields not listed here are skipped while
+# decoding, and nested fields may be null
+class ScoreValue(msgspec.Struct):
+    goals: int | None = None
+    participant: str | None = None
+
+class Score(msgspec.Struct):
+    description: str | None = None
+    score: ScoreValue | None = None
+
+class ParticipantMeta(msgspec.Struct):
+    location: str | None = None
+
+class Participant(msgspec.Struct):
+    id: int | None = None
+    name: str | None = None
+    meta: ParticipantMeta | None = None
+
+class Formation(msgspec.Struct):
+    formation: str | None = None
+    location: str | None = None
+
+class Fixture(msgspec.Struct, frozen=True):
+    id: int | None = None
+    starting_at: str | None = None
+    participants: list[Participant] | None = None
+    # v3 list of Score; pre-v3 payloads may send a dict keyed by side or a "2-1" string
+    scores: list[Score] | dict | str | None = None
+    formations: list[Formation] | None = None
+
+_FIXTURE_DECODER = msgspec.json.Decoder(Fixture)
+
+class Pagination(msgspec.Struct):
+    has_more: bool = False
+    total: int | None = None
+    total_pages: int | None = None
+    last_page: int | None = None
+
+class ApiEnvelope(msgspec.Struct):
+    # Fixtures stay raw so parse_fixtures can decode (or skip) each one on its
+    # own and hand legacy layouts to the dict fallbacks
+    data: list[msgspec.Raw] | None = None
+    pagination: Pagination | None = None
+
+# Shared session so league/season lookups reuse one keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(total=PAGE_RETRIES, backoff_factor=RETRY_BACKOFF, status_forcelist=list(RETRY_STATUSES)),
+    pool_connections=4,
+    pool_maxsize=16
+))
+SESSION.params = {"api_token": API_TOKEN}
+SESSION.headers["Accept-Encoding"] = "gzip"
+
+# On-disk cache for rarely-changing endpoints (leagues, seasons)
+HTTP_CACHE_DIR = os.path.expanduser("~/.cache/formation-predictor")
+HTTP_CACHE_INDEX = os.path.join(HTTP_CACHE_DIR, "http.json")
+
+# Score strings such as "3-1", "2:0" or "1\u20131"
+_SCORE_RE = re.compile(r"(\d+)\s*[-:\u2013]\s*(\d+)")
+
+# League name heuristics used by _select_league
+_LEAGUE_RE = re.compile(r"superliga|denmark|super", re.I)
+_PLAY_RE = re.compile(r"play", re.I)
+_LEAGUE_PRIORITY_LABELS = {
+    0: "✅ Selected",
+    1: "⚠️  Fallback selected",
+    2: "⚠️  Fallback (denmark) selected",
+}
 
 def print_step(num, msg):
     print(f"\n{'='*70}")
     print(f"Step {num}: {msg}")
     print('='*70)
 
+def _load_http_cache():
+    try:
+        with open(HTTP_CACHE_INDEX) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _save_http_cache(index):
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(HTTP_CACHE_INDEX, "w") as fh:
+            json.dump(index, fh)
+    except OSError:
+        pass
+
+def cached_get(url, params=None, timeout=10):
+    """GET a rarely-changing endpoint using ETag/Last-Modified revalidation.
+
+    Returns (payload, response). payload is the decoded JSON body, served
+    from the on-disk cache on a 304, or None if the request failed.
+    """
+    key = f"{url}?{urlencode(sorted((params or {}).items()))}"
+    index = _load_http_cache()
+    entry = index.get(key)
+
+    headers = {}
+    if entry and os.path.exists(entry["body_path"]):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = SESSION.get(url, params=params, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and headers:
+        with open(entry["body_path"], "rb") as fh:
+            return orjson.loads(fh.read()), response
+
+    if response.status_code != 200:
+        return None, response
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        body_path = os.path.join(HTTP_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+        try:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            with open(body_path, "wb") as fh:
+                fh.write(response.content)
+            index[key] = {"etag": etag, "last_modified": last_modified, "body_path": body_path}
+            _save_http_cache(index)
+        except OSError:
+            pass
+
+    return orjson.loads(response.content), response
+
+def _select_league(leagues):
+    """Pick the best Superliga candidate in a single pass.
+
+    Priorities (lower wins, ties go to the earliest league):
+    0) name contains 'superliga' and not 'play'
+    1) name contains 'super' and not 'play'
+    2) name contains 'denmark'
+    Returns (league, priority) or (None, None).
+    """
+    best, best_priority = None, None
+    for league in leagues:
+        name = league.get("name") or ""
+        hits = {m.lower() for m in _LEAGUE_RE.findall(name)}
+        if not hits:
+            continue
+        play = _PLAY_RE.search(name) is not None
+        if "superliga" in hits and not play:
+            priority = 0
+        elif ("super" in hits or "superliga" in hits) and not play:
+            priority = 1
+        elif "denmark" in hits:
+            priority = 2
+        else:
+            continue
+        if best_priority is None or priority < best_priority:
+            best, best_priority = league, priority
+            if priority == 0:
+                break
+    return best, best_priority
+
 def find_danish_league():
     """Find the Danish league ID in accessible leagues
 
@@ -35,13 +218,9 @@ def find_danish_league():
     print("Finding Danish Superliga...")
 
     try:
-        response = requests.get(
-            f"{API_BASE}/leagues",
-            params={"api_token": API_TOKEN, "per_page": 100},
-            timeout=10
-        )
+        payload, response = cached_get(f"{API_BASE}/leagues", params={"per_page": 100})
 
-        if response.status_code != 200:
+        if payload is None:
             print(f"❌ Error fetching leagues: {response.status_code}")
             try:
                 error_data = response.json()
@@ -50,7 +229,7 @@ def find_danish_league():
                 print(f"   Response: {response.text[:200]}")
             return None
 
-        leagues = response.json().get("data", [])
+        leagues = payload.get("data", [])
 
         # Print available league names to help the user confirm
         if leagues:
@@ -59,38 +238,11 @@ def find_danish_league():
             for n in names:
                 print(f"  - {n}")
 
-        # Strategy:
-        # 1) Prefer league names that contain 'superliga' and NOT 'play'
-        for league in leagues:
-            league_name = (league.get("name", "") or "").lower()
-            if "superliga" in league_name and "play" not in league_name:
-                league_id = league["id"]
-                print(f"✅ Selected: {league.get('name')} (ID: {league_id})")
-                return league_id
-
-        # 2) If none found, prefer exact match 'superliga'
-        for league in leagues:
-            league_name = (league.get("name", "") or "").strip().lower()
-            if league_name == "superliga":
-                league_id = league["id"]
-                print(f"✅ Selected (exact): {league.get('name')} (ID: {league_id})")
-                return league_id
-
-        # 3) As a fallback, prefer names that contain 'super' but not 'play'
-        for league in leagues:
-            league_name = (league.get("name", "") or "").lower()
-            if "super" in league_name and "play" not in league_name:
-                league_id = league["id"]
-                print(f"⚠️  Fallback selected: {league.get('name')} (ID: {league_id})")
-                return league_id
-
-        # 4) Last resort: look for any league with 'denmark' in the name
-        for league in leagues:
-            league_name = (league.get("name", "") or "").lower()
-            if "denmark" in league_name:
-                league_id = league["id"]
-                print(f"⚠️  Fallback (denmark) selected: {league.get('name')} (ID: {league_id})")
-                return league_id
+        league, priority = _select_league(leagues)
+        if league is not None:
+            league_id = league["id"]
+            print(f"{_LEAGUE_PRIORITY_LABELS[priority]}: {league.get('name')} (ID: {league_id})")
+            return league_id
 
         print("❌ Danish Superliga not found in accessible leagues")
         print(f"   Available: {', '.join([l.get('name') for l in leagues[:5]])}")
@@ -100,34 +252,87 @@ def find_danish_league():
         print(f"❌ Error: {e}")
         return None
 
+def discover_league_and_season():
+    """Resolve the league and its current season in a single request
+
+    Asks for Danish leagues with their current season included, then applies
+    the same name heuristics as find_danish_league. Returns
+    (league_id, season_id), where season_id may be None if the league has no
+    current season, or None if the request fails so callers can fall back to
+    find_danish_league/find_season.
+    """
+    print("Discovering Danish Superliga and current season...")
+
+    try:
+        payload, response = cached_get(
+            f"{API_BASE}/leagues",
+            params={
+                "include": "currentSeason",
+                "filters": f"leagueCountries:{DENMARK_COUNTRY_ID}"
+            }
+        )
+
+        if payload is None:
+            if 400 <= response.status_code < 500:
+                print(f"⚠️  Combined lookup not available ({response.status_code}), falling back")
+            else:
+                print(f"❌ Error fetching leagues: {response.status_code}")
+            return None
+
+        league, priority = _select_league(payload.get("data", []))
+        if league is None:
+            print("⚠️  No Superliga candidate in combined lookup, falling back")
+            return None
+
+        league_id = league["id"]
+        print(f"{_LEAGUE_PRIORITY_LABELS[priority]}: {league.get('name')} (ID: {league_id})")
+
+        # Include keys come back lowercased in v3 responses
+        season = league.get("currentseason") or league.get("currentSeason") or {}
+        season_id = season.get("id")
+        if season_id:
+            print(f"✅ Current season: {season.get('name', '?')} (ID: {season_id})")
+        return league_id, season_id
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
+
+def _probe_season(season_id):
+    """Request a single fixture to check whether a season is accessible"""
+    # Use filters=fixtureSeasons:ID which is the correct v3 way and works on Free Tier
+    return SESSION.get(
+        f"{API_BASE}/fixtures",
+        params={
+            "filters": f"fixtureSeasons:{season_id}",
+            "per_page": 1,
+            # only the status matters here, so skip includes and trim the body
+            "select": "id"
+        },
+        timeout=10
+    )
+
 def find_season(league_id, prefer_current=True):
     """Find a season ID for the given league that has fixtures
 
     Fetch seasons directly from the league endpoint to get all available seasons.
-    Test seasons ordered by starting_at (most recent first). Prefer seasons
-    where `is_current` is True if available. Returns the first accessible
-    season ID or None.
+    If `prefer_current` and a season is flagged `is_current`, return it
+    without probing. Otherwise probe seasons ordered by starting_at (most
+    recent first) and return the first accessible season ID or None.
     """
     print(f"Finding available seasons for league {league_id}...")
 
     try:
         # Fetch league with its seasons (gets more complete list than /seasons endpoint)
-        response = requests.get(
-            f"{API_BASE}/leagues/{league_id}",
-            params={
-                "api_token": API_TOKEN,
-                "include": "seasons"
-            },
-            timeout=10
-        )
+        payload, response = cached_get(f"{API_BASE}/leagues/{league_id}", params={"include": "seasons"})
 
-        if response.status_code != 200:
+        if payload is None:
             print(f"❌ Error fetching league: {response.status_code}")
             error_data = response.json() if response.headers.get('content-type') == 'application/json' else {}
             print(f"   {error_data.get('message', response.text[:200])}")
             return None
 
-        league = response.json().get("data", {})
+        league = payload.get("data", {})
         seasons = league.get("seasons", [])
 
         if not seasons:
@@ -137,42 +342,34 @@ def find_season(league_id, prefer_current=True):
         # Sort by starting_at descending (most recent first)
         seasons = sorted(seasons, key=lambda s: s.get('starting_at', ''), reverse=True)
 
-        # Prefer current season if available, but test others if current isn't accessible
+        # The seasons include already marks the current season, so no probe is needed
         if prefer_current:
-            current_season = None
-            other_seasons = []
-            for s in seasons:
-                if s.get('is_current'):
-                    current_season = s
-                else:
-                    other_seasons.append(s)
-
+            current_season = next((s for s in seasons if s.get('is_current')), None)
             if current_season:
-                print(f"Found current season candidate: {current_season.get('name')} (ID: {current_season['id']})")
-                seasons = [current_season] + other_seasons
+                print(f"✅ Using current season: {current_season.get('name')} (ID: {current_season['id']})")
+                return current_season["id"]
 
-        print(f"Found {len(seasons)} seasons for league {league_id}, testing from most recent...")
+        print(f"Found {len(seasons)} seasons for league {league_id}, testing in parallel...")
+
+        # Probe all seasons concurrently, then take the first accessible one in priority order
+        results = {}
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {executor.submit(_probe_season, s["id"]): s["id"] for s in seasons}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
 
-        # Test each season
         for season in seasons:
             season_id = season["id"]
             year = season.get("year") or season.get("name") or "?"
+            test_response = results[season_id]
 
-            # Use filters=fixtureSeasons:ID which is the correct v3 way and works on Free Tier
-            test_response = requests.get(
-                f"{API_BASE}/fixtures",
-                params={
-                    "api_token": API_TOKEN,
-                    "filters": f"fixtureSeasons:{season_id}",
-                    "per_page": 1,
-                    # request scores and scoreboards so we can detect numeric goals when available
-                    "include": "participants;scores;formations"
-                },
-                timeout=10
-            )
-
-            if test_response.status_code == 200:
-                fixtures = test_response.json().get("data", [])
+            if isinstance(test_response, Exception):
+                print(f"⚠️  Season {year} (ID: {season_id}) - Not accessible: {test_response}")
+            elif test_response.status_code == 200:
+                fixtures = orjson.loads(test_response.content).get("data", [])
                 print(f"✅ Season {year} (ID: {season_id}) - {len(fixtures)} fixtures available")
                 return season_id
             else:
@@ -190,127 +387,235 @@ def find_season(league_id, prefer_current=True):
         print(f"❌ Error: {e}")
         return None
 
-def fetch_all_fixtures(season_id, max_pages=0):
-    """Fetch all fixtures for a season. If max_pages>0, stop after that many pages."""
-    print(f"Fetching fixtures for season {season_id}...")
-
-    fixtures = []
-    page = 1
-    per_page = 100
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying: honour Retry-After, else exponential backoff."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    return RETRY_BACKOFF * (2 ** attempt)
 
-    try:
-        while True:
-            if max_pages and page > max_pages:
-                print(f"Reached max_pages limit ({max_pages}). Stopping early.")
-                break
+def order_seasons_chronologically(league_id, season_ids):
+    """Return season_ids sorted by season start date, oldest first
 
-            print(f"  Page {page}...", end=" ", flush=True)
+    Pages within a season arrive sorted by starting_at, so writing whole
+    seasons oldest first keeps the combined output chronological. Start
+    dates come from the (cached) league seasons include, with a per-season
+    lookup for ids not listed there. Seasons whose start can't be found
+    keep their given order at the end.
+    """
+    starts = {}
+    payload, _ = cached_get(f"{API_BASE}/leagues/{league_id}", params={"include": "seasons"})
+    if payload is not None:
+        for season in payload.get("data", {}).get("seasons", []):
+            starts[season["id"]] = season.get("starting_at")
 
-            response = requests.get(
+    for sid in season_ids:
+        if not starts.get(sid):
+            payload, _ = cached_get(f"{API_BASE}/seasons/{sid}")
+            if payload is not None:
+                starts[sid] = payload.get("data", {}).get("starting_at")
+
+    unknown = [sid for sid in season_ids if not starts.get(sid)]
+    if unknown:
+        print(f"⚠️  No start date for season(s) {unknown}; writing them last")
+    known = sorted((sid for sid in season_ids if starts.get(sid)), key=lambda sid: starts[sid])
+    return known + unknown
+
+async def _get_page(session, sem, season_id, page, per_page):
+    """Fetch a single fixtures page, bounded by the shared semaphore.
+
+    Retries 429/5xx responses up to PAGE_RETRIES times with backoff; the
+    semaphore slot is held while waiting so retries also slow the fan-out.
+    """
+    async with sem:
+        for attempt in range(PAGE_RETRIES + 1):
+            async with session.get(
                 f"{API_BASE}/fixtures",
                 params={
                     "api_token": API_TOKEN,
                     "filters": f"fixtureSeasons:{season_id}",
                     # request score-related relations so numeric goals are returned when available
-                    "include": "participants;scores;formations",
+                    **FIXTURE_FIELDS,
+                    # server-side ordering so pages arrive in date order
+                    "sort": "starting_at",
                     "per_page": per_page,
                     "page": page
                 },
-                timeout=10
-            )
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    return msgspec.json.decode(await response.read(), type=ApiEnvelope)
+                if response.status not in RETRY_STATUSES or attempt == PAGE_RETRIES:
+                    text = await response.text()
+                    raise RuntimeError(f"page {page}: {response.status} - {text[:200]}")
+                delay = _retry_delay(response, attempt)
+            await asyncio.sleep(delay)
+
+async def _fetch_all_fixtures_async(session, season_id, max_pages):
+    """Yield fixture batches in page order, fanning out pages 2..N concurrently."""
+    per_page = 100
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)  # Rate limiting
+
+    print("  Page 1...", end=" ", flush=True)
+    envelope = await _get_page(session, sem, season_id, 1, per_page)
+    batch = envelope.data or []
+    print(f"✓ ({len(batch)} fixtures)")
+    yield batch
+
+    pagination = envelope.pagination or Pagination()
+    if not pagination.has_more:
+        return
+
+    # Use the reported page count when available, otherwise fan out in
+    # windows of MAX_CONCURRENCY pages until the API stops reporting more.
+    total_pages = pagination.total_pages or pagination.last_page
+    if not total_pages and pagination.total:
+        total_pages = -(-pagination.total // per_page)
+
+    page = 2
+    while True:
+        if max_pages and page > max_pages:
+            print(f"Reached max_pages limit ({max_pages}). Stopping early.")
+            return
+
+        last = total_pages or page + MAX_CONCURRENCY - 1
+        if max_pages:
+            last = min(last, max_pages)
+
+        print(f"  Pages {page}-{last}...", end=" ", flush=True)
+        tasks = [
+            asyncio.create_task(_get_page(session, sem, season_id, p, per_page))
+            for p in range(page, last + 1)
+        ]
+        try:
+            # Consume in page order: the first page without has_more ends the
+            # season, so errors from speculative pages past it are never raised
+            for task in tasks:
+                result = await task
+                yield result.data or []
+                if not (result.pagination and result.pagination.has_more):
+                    print("✓")
+                    return
+        finally:
+            pending = [t for t in tasks if not t.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        print("✓")
+
+        if total_pages:
+            return
+        page = last + 1
+
+async def _fetch_with_session(season_id, max_pages):
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async for batch in _fetch_all_fixtures_async(session, season_id, max_pages):
+            yield batch
 
-            if response.status_code != 200:
-                print(f"\n❌ Error: {response.status_code}")
-                error_data = response.json() if response.headers.get('content-type') == 'application/json' else {}
-                print(f"   {error_data.get('message', response.text[:200])}")
-                return None
+def fetch_all_fixtures(season_id, max_pages=0):
+    """Yield fixtures for a season one page at a time. If max_pages>0, stop after that many pages.
 
-            data = response.json()
-            batch = data.get("data", [])
+    Any fetch error is re-raised after the pages before it have been
+    yielded, so callers can discard the partial season.
+    """
+    print(f"Fetching fixtures for season {season_id}...")
 
-            print(f"✓ ({len(batch)} fixtures)")
-            fixtures.extend(batch)
+    loop = asyncio.new_event_loop()
+    pages = _fetch_with_session(season_id, max_pages)
+    total = 0
 
-            if not data.get("pagination", {}).get("has_more"):
+    try:
+        while True:
+            try:
+                batch = loop.run_until_complete(pages.__anext__())
+            except StopAsyncIteration:
                 break
+            total += len(batch)
+            yield batch
 
-            page += 1
-            time.sleep(0.5)  # Rate limiting
-
-        print(f"\n✅ Total fixtures retrieved: {len(fixtures)}")
-        return fixtures
+        print(f"\n✅ Total fixtures retrieved: {total}")
 
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        return None
+        raise
+
+    finally:
+        loop.run_until_complete(pages.aclose())
+        loop.close()
+
+_DIRECT_HOME_KEYS = ['localteam_score', 'local_team_score', 'home_score', 'home_goals', 'home']
+_DIRECT_AWAY_KEYS = ['visitorteam_score', 'visitor_team_score', 'away_score', 'away_goals', 'away']
+
+def _extract_v3(fixture):
+    """SportMonks v3 `scores` list: pick the CURRENT goals for each side."""
+    home_goals = None
+    away_goals = None
+    for s in fixture.scores:
+        if s.description == 'CURRENT' and s.score is not None:
+            if s.score.participant == 'home':
+                home_goals = s.score.goals
+            elif s.score.participant == 'away':
+                away_goals = s.score.goals
+            if home_goals is not None and away_goals is not None:
+                return int(home_goals), int(away_goals)
+
+    # Sparse v3 payloads carry none of the fields the legacy fallbacks read
+    return 0, 0
 
-def _extract_goals_from_fixture(fixture):
-    """Return (home_goals, away_goals) by trying multiple fields/structures."""
-    # Try SportMonks v3 scores structure first
-    scores = fixture.get('scores', [])
-    if isinstance(scores, list) and scores:
-        home_goals = None
-        away_goals = None
-        for s in scores:
-            if s.get('description') == 'CURRENT':
-                score_data = s.get('score', {})
-                if score_data.get('participant') == 'home':
-                    home_goals = score_data.get('goals')
-                elif score_data.get('participant') == 'away':
-                    away_goals = score_data.get('goals')
-        
-        if home_goals is not None and away_goals is not None:
-            return int(home_goals), int(away_goals)
-
-    # Fallback to original heuristics for safety
-    # 1) Direct known fields
-    direct_home_keys = ['localteam_score', 'local_team_score', 'home_score', 'home_goals', 'home']
-    direct_away_keys = ['visitorteam_score', 'visitor_team_score', 'away_score', 'away_goals', 'away']
-
-    for hk in direct_home_keys:
+def _extract_flat(fixture):
+    """Numeric goals stored directly on the fixture (older API versions)."""
+    for hk in _DIRECT_HOME_KEYS:
         if hk in fixture and isinstance(fixture[hk], (int, float)):
-            for ak in direct_away_keys:
+            for ak in _DIRECT_AWAY_KEYS:
                 if ak in fixture and isinstance(fixture[ak], (int, float)):
                     return int(fixture[hk]), int(fixture[ak])
+    return None
+
+def _extract_scores_dict(fixture):
+    """A `scores` dict keyed by side."""
+    scores = fixture.get('scores') or fixture.get('scores_calculated')
+    # try common key pairs
+    for k1 in ['home', 'local', 'localteam', 'team1']:
+        for k2 in ['away', 'visitor', 'visitorteam', 'team2']:
+            if k1 in scores and k2 in scores and isinstance(scores[k1], (int, float)) and isinstance(scores[k2], (int, float)):
+                return int(scores[k1]), int(scores[k2])
+    # flatten numeric values in scores dict (pick first two) as last resort
+    nums = [v for v in scores.values() if isinstance(v, (int, float))]
+    if len(nums) >= 2:
+        return int(nums[0]), int(nums[1])
+    return None
+
+def _extract_sb(fixture):
+    """A `scoreboards` list with numeric fields or score strings."""
+    for sb in fixture['scoreboards']:
+        if not isinstance(sb, dict):
+            continue
+        # common numeric fields
+        for hk in ['score_local', 'local_score', 'home_score', 'home']:
+            for ak in ['score_visitor', 'visitor_score', 'away_score', 'away']:
+                if hk in sb and ak in sb and isinstance(sb[hk], (int, float)) and isinstance(sb[ak], (int, float)):
+                    return int(sb[hk]), int(sb[ak])
+        # sometimes there's a 'score' string like '2-1'
+        sc = sb.get('score') or sb.get('value') or sb.get('score_string')
+        if isinstance(sc, str) and '-' in sc:
+            parts = sc.split('-')
+            try:
+                return int(parts[0].strip()), int(parts[1].strip())
+            except Exception:
+                pass
+    return None
 
-    # 2) scores dict
-    scores = fixture.get('scores') or fixture.get('scores_calculated') or {}
-    if isinstance(scores, dict):
-        # try common key pairs
-        def find_pair(d, keys1, keys2):
-            for k1 in keys1:
-                for k2 in keys2:
-                    if k1 in d and k2 in d and isinstance(d[k1], (int, float)) and isinstance(d[k2], (int, float)):
-                        return int(d[k1]), int(d[k2])
-            return None
-
-        pair = find_pair(scores, ['home','local','localteam','team1'], ['away','visitor','visitorteam','team2'])
-        if pair:
-            return pair
-        # flatten numeric values in scores dict (pick first two) as last resort
-        nums = [v for v in scores.values() if isinstance(v, (int, float))]
-        if len(nums) >= 2:
-            return int(nums[0]), int(nums[1])
-
-    # 3) scoreboards list
-    sbs = fixture.get('scoreboards') or []
-    if isinstance(sbs, list) and sbs:
-        for sb in sbs:
-            # common numeric fields
-            for hk in ['score_local','local_score','home_score','home']:
-                for ak in ['score_visitor','visitor_score','away_score','away']:
-                    if hk in sb and ak in sb and isinstance(sb[hk], (int, float)) and isinstance(sb[ak], (int, float)):
-                        return int(sb[hk]), int(sb[ak])
-            # sometimes there's a 'score' string like '2-1'
-            sc = sb.get('score') or sb.get('value') or sb.get('score_string')
-            if isinstance(sc, str) and '-' in sc:
-                parts = sc.split('-')
-                try:
-                    return int(parts[0].strip()), int(parts[1].strip())
-                except Exception:
-                    pass
-
-    # 4) fixture-level score string
+def _extract_from_text(fixture):
+    """Last resort: scan score strings on the fixture and in nested objects."""
+    # fixture-level score string
     sc = fixture.get('score') or fixture.get('scores')
     if isinstance(sc, str) and '-' in sc:
         parts = sc.split('-')
@@ -319,38 +624,28 @@ def _extract_goals_from_fixture(fixture):
         except Exception:
             pass
 
-    # 4b) try to parse numeric scores from textual result_info (e.g. "3-1")
-    import re
+    # try to parse numeric scores from textual result_info (e.g. "3-1")
     result_text = fixture.get('result_info') or fixture.get('result') or ''
     if isinstance(result_text, str):
-        m = re.search(r"(\d+)\s*[-:\u2013]\s*(\d+)", result_text)
+        m = _SCORE_RE.search(result_text)
         if m:
-            try:
-                return int(m.group(1)), int(m.group(2))
-            except Exception:
-                pass
+            return int(m.group(1)), int(m.group(2))
 
-    # 4c) check participants or stats fields for numeric score strings
+    # check participants or stats fields for numeric score strings
     # sometimes scores may be embedded in nested text
-    def find_score_in_obj(obj):
-        if isinstance(obj, dict):
-            for k,v in obj.items():
-                if isinstance(v, str):
-                    m = re.search(r"(\d+)\s*[-:\u2013]\s*(\d+)", v)
-                    if m:
-                        try:
-                            return int(m.group(1)), int(m.group(2))
-                        except Exception:
-                            pass
-                else:
-                    res = find_score_in_obj(v)
-                    if res:
-                        return res
-        elif isinstance(obj, list):
-            for item in obj:
-                res = find_score_in_obj(item)
-                if res:
-                    return res
+    def find_score_in_obj(root):
+        # Iterative depth-first walk; children are pushed reversed to keep document order
+        stack = [root]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                stack.extend(reversed(list(obj.values())))
+            elif isinstance(obj, list):
+                stack.extend(reversed(obj))
+            elif isinstance(obj, str):
+                m = _SCORE_RE.search(obj)
+                if m:
+                    return int(m.group(1)), int(m.group(2))
         return None
 
     # look in participants and stats
@@ -360,110 +655,210 @@ def _extract_goals_from_fixture(fixture):
             if res:
                 return res
 
-    # 5) No score found
-    return 0, 0
+    return None
+
+# Extractors for pre-v3 layouts; they read the raw fixture mapping
+_SHAPE_EXTRACTORS = {
+    "flat_fields": _extract_flat,
+    "scores_dict": _extract_scores_dict,
+    "scoreboards": _extract_sb,
+}
+
+def _detect_shape(fixture):
+    """Classify which legacy score layout a raw fixture mapping uses, or None."""
+    if any(k in fixture for k in _DIRECT_HOME_KEYS):
+        return "flat_fields"
+    if isinstance(fixture.get('scores') or fixture.get('scores_calculated'), dict):
+        return "scores_dict"
+    if isinstance(fixture.get('scoreboards'), list) and fixture['scoreboards']:
+        return "scoreboards"
+    return None
+
+def _extract_goals_from_fixture(fixture, raw):
+    """Return (home_goals, away_goals) for a typed fixture and its raw JSON.
+
+    v3 payloads are read from the typed `scores`; anything else decodes the
+    raw fixture once into a plain mapping and dispatches on its layout.
+    """
+    if isinstance(fixture.scores, list) and fixture.scores:
+        return _extract_v3(fixture)
 
+    legacy = msgspec.json.decode(raw)
+    shape = _detect_shape(legacy)
+    if shape is not None:
+        res = _SHAPE_EXTRACTORS[shape](legacy)
+        if res:
+            return res
 
-def _fixture_has_numeric_scores(fixture):
-    """Return True if a fixture contains numeric goal values anywhere we can use."""
-    # Check common direct fields
-    for k in ['localteam_score','local_team_score','home_score','home_goals','visitorteam_score','visitor_team_score','away_score','away_goals']:
-        if k in fixture and isinstance(fixture[k], (int, float)):
-            return True
-
-    # Check scores dict
-    scores = fixture.get('scores') or fixture.get('scores_calculated') or {}
-    if isinstance(scores, dict):
-        for v in scores.values():
-            if isinstance(v, (int, float)):
-                return True
-
-    # Check scoreboards
-    sbs = fixture.get('scoreboards') or []
-    if isinstance(sbs, list):
-        for sb in sbs:
-            for v in sb.values():
-                if isinstance(v, (int, float)):
-                    return True
-            sc = sb.get('score') or sb.get('value')
-            if isinstance(sc, str) and '-' in sc:
-                parts = sc.split('-')
-                try:
-                    int(parts[0].strip()); int(parts[1].strip())
-                    return True
-                except Exception:
-                    pass
+    res = _extract_from_text(legacy)
+    if res:
+        return res
 
-    # No numeric scores found
-    return False
+    # No score found
+    return 0, 0
 
 
 def parse_fixtures(fixtures):
-    """Parse API fixture data into a DataFrame"""
-    rows = []
-
-    for fixture in fixtures:
+    """Parse a page of raw API fixtures into a DataFrame"""
+    columns = {
+        "fixture_id": [],
+        "date": [],
+        "home_team_id": [],
+        "home_team_name": [],
+        "away_team_id": [],
+        "away_team_name": [],
+        "home_goals": [],
+        "away_goals": [],
+        "home_formation": [],
+        "away_formation": [],
+    }
+
+    bad = 0
+    for raw in fixtures:
         try:
-            fixture_id = fixture["id"]
-            date = fixture.get("starting_at") or fixture.get('time') or fixture.get('date')
-
-            # Extract goals robustly
-            home_goals, away_goals = _extract_goals_from_fixture(fixture)
-
-            participants = fixture.get("participants", [])
-
-            home_team = None
-            away_team = None
-            home_team_name = None
-            away_team_name = None
-
-            for p in participants:
-                if p.get("meta", {}).get("location") == "home":
-                    home_team = p.get("id")
-                    home_team_name = p.get("name")
-                elif p.get("meta", {}).get("location") == "away":
-                    away_team = p.get("id")
-                    away_team_name = p.get("name")
-
-            # Extract formations
-            home_formation = None
-            away_formation = None
-            formations = fixture.get("formations", [])
-            if isinstance(formations, list):
-                for f in formations:
-                    if f.get("location") == "home":
-                        home_formation = f.get("formation")
-                    elif f.get("location") == "away":
-                        away_formation = f.get("formation")
-
-            rows.append({
-                "fixture_id": fixture_id,
-                "date": date,
-                "home_team_id": home_team,
-                "home_team_name": home_team_name,
-                "away_team_id": away_team,
-                "away_team_name": away_team_name,
-                "home_goals": home_goals,
-                "away_goals": away_goals,
-                "home_formation": home_formation,
-                "away_formation": away_formation,
-                "goal_diff": home_goals - away_goals if (home_goals is not None and away_goals is not None) else None,
-                "result": (
-                    "H" if home_goals > away_goals else
-                    "A" if away_goals > home_goals else
-                    "D"
-                ) if (home_goals is not None and away_goals is not None) else None
-            })
-        except Exception as e:
-            print(f"⚠️  Error parsing fixture {fixture.get('id')}: {e}")
+            fixture = _FIXTURE_DECODER.decode(raw)
+        except msgspec.ValidationError:
+            bad += 1
+            continue
+        fixture_id = fixture.id
+        if fixture_id is None:
+            bad += 1
             continue
+        date = fixture.starting_at
+        if date is None:
+            legacy = msgspec.json.decode(raw)
+            date = legacy.get('time') or legacy.get('date')
+
+        home_goals, away_goals = _extract_goals_from_fixture(fixture, raw)
+
+        home_team = None
+        away_team = None
+        home_team_name = None
+        away_team_name = None
+
+        for p in fixture.participants or ():
+            loc = p.meta.location if p.meta else None
+            if loc == "home":
+                home_team, home_team_name = p.id, p.name
+            elif loc == "away":
+                away_team, away_team_name = p.id, p.name
+
+        # Extract formations
+        home_formation = None
+        away_formation = None
+        for f in fixture.formations or ():
+            if f.location == "home":
+                home_formation = f.formation
+            elif f.location == "away":
+                away_formation = f.formation
+
+        values = (
+            fixture_id, date,
+            home_team, home_team_name,
+            away_team, away_team_name,
+            home_goals, away_goals,
+            home_formation, away_formation,
+        )
+        for column, value in zip(columns.values(), values):
+            column.append(value)
+
+    if bad:
+        print(f"⚠️  Skipped {bad} malformed fixtures")
+
+    # Derive goal difference and result in one vectorized pass; the goal
+    # extractors always return ints, so the lists convert straight to int16
+    home_list, away_list = columns["home_goals"], columns["away_goals"]
+    h = np.fromiter(home_list, dtype=np.int16, count=len(home_list))
+    a = np.fromiter(away_list, dtype=np.int16, count=len(away_list))
+    gd = h - a
+
+    df = pd.DataFrame(columns)
+    df["goal_diff"] = gd
+    df["result"] = np.where(gd > 0, "H", np.where(gd < 0, "A", "D"))
+
+    return optimize_dataframe(df)
+
+def optimize_dataframe(df):
+    """Downcast parsed fixture columns to compact dtypes and parse dates"""
+    df["date"] = pd.to_datetime(df["date"], format="ISO8601", utc=True)
+    df["home_goals"] = df["home_goals"].astype("Int8")
+    df["away_goals"] = df["away_goals"].astype("Int8")
+    df["goal_diff"] = df["goal_diff"].astype("Int16")
+    df["home_team_id"] = df["home_team_id"].astype("Int32")
+    df["away_team_id"] = df["away_team_id"].astype("Int32")
+    category_cols = ["home_formation", "away_formation", "result"]
+    df[category_cols] = df[category_cols].astype("category")
+    return df
+
+# Parquet schema for parse_fixtures output. It is fixed up front so a first
+# chunk with all-null columns cannot pin them to a null type.
+FIXTURE_SCHEMA = pa.schema([
+    ("fixture_id", pa.int64()),
+    ("date", pa.timestamp("us", tz="UTC")),
+    ("home_team_id", pa.int32()),
+    ("home_team_name", pa.string()),
+    ("away_team_id", pa.int32()),
+    ("away_team_name", pa.string()),
+    ("home_goals", pa.int8()),
+    ("away_goals", pa.int8()),
+    ("home_formation", pa.dictionary(pa.int8(), pa.string())),
+    ("away_formation", pa.dictionary(pa.int8(), pa.string())),
+    ("goal_diff", pa.int16()),
+    ("result", pa.dictionary(pa.int8(), pa.string())),
+])
+
+class FixtureWriter:
+    """Append parsed fixture chunks to Parquet (and optionally CSV)
+
+    Chunks go to `.part` files that are moved into place by `commit()`,
+    so a failed run leaves the previous output intact.
+    """
 
-    return pd.DataFrame(rows)
+    def __init__(self, basename, write_csv=True):
+        self.parquet_file = basename + ".parquet"
+        self.csv_file = basename + ".csv" if write_csv else None
+        self._writer = None
+        self._csv_header = True
+        for path in self._outputs():
+            if os.path.exists(path + ".part"):
+                os.remove(path + ".part")
+
+    def _outputs(self):
+        return [p for p in (self.parquet_file, self.csv_file) if p]
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, schema=FIXTURE_SCHEMA, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.parquet_file + ".part", table.schema, compression="zstd")
+        self._writer.write_table(table)
+
+        if self.csv_file:
+            df.to_csv(self.csv_file + ".part", mode="a", header=self._csv_header, index=False)
+            self._csv_header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def abort(self):
+        """Discard everything written so far, leaving previous outputs untouched"""
+        self.close()
+        for path in self._outputs():
+            if os.path.exists(path + ".part"):
+                os.remove(path + ".part")
+
+    def commit(self):
+        self.close()
+        for path in self._outputs():
+            os.replace(path + ".part", path)
+        return self._outputs()
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch Danish Superliga fixtures from SportMonks')
     parser.add_argument('--season-id', type=int, nargs='+', help='Override season ID(s) to fetch')
     parser.add_argument('--max-pages', type=int, default=0, help='Max pages to fetch (0 = unlimited)')
+    parser.add_argument('--no-csv', action='store_true', help='Only write Parquet output (skip the CSV copy)')
     args = parser.parse_args()
 
     print("\n" + "🚀 "*20)
@@ -472,7 +867,12 @@ def main():
 
     # Step 1: Find league
     print_step(1, "Finding Danish Superliga league")
-    league_id = find_danish_league()
+    season_id = None
+    discovered = discover_league_and_season()
+    if discovered:
+        league_id, season_id = discovered
+    else:
+        league_id = find_danish_league()
     if not league_id:
         print("❌ Cannot proceed without valid league")
         return False
@@ -483,6 +883,10 @@ def main():
         season_ids = args.season_id
         print_step(2, "Using user-provided season(s)")
         print(f"✅ Using season IDs: {season_ids}")
+    elif season_id:
+        season_ids = [season_id]
+        print_step(2, "Using current season from league lookup")
+        print(f"✅ Using season ID: {season_id}")
     else:
         print_step(2, "Finding available season")
         sid = find_season(league_id)
@@ -493,41 +897,47 @@ def main():
         print("❌ Cannot proceed without valid season(s)")
         return False
 
-    # Step 3: Fetch fixtures for all seasons
+    # Step 3: Fetch, parse and append fixtures one page at a time
     print_step(3, f"Fetching fixtures for {len(season_ids)} season(s)")
-    all_fixtures = []
+    if len(season_ids) > 1:
+        season_ids = order_seasons_chronologically(league_id, season_ids)
+        print(f"Writing seasons oldest first: {season_ids}")
+    writer = FixtureWriter("danish_superliga_fixtures", write_csv=not args.no_csv)
+
+    total = 0
+    preview = None
     for sid in season_ids:
         print(f"⏳ Fetching fixtures for season ID: {sid}...")
-        fixtures = fetch_all_fixtures(sid, max_pages=args.max_pages)
-        if fixtures:
-            all_fixtures.extend(fixtures)
-            print(f"✅ Retrieved {len(fixtures)} fixtures for season {sid}")
+        saved = 0
+        try:
+            for batch in fetch_all_fixtures(sid, max_pages=args.max_pages):
+                df_chunk = parse_fixtures(batch)
+                if df_chunk.empty:
+                    continue
+                writer.write(df_chunk)
+                saved += len(df_chunk)
+                if preview is None:
+                    preview = df_chunk.head()
+        except Exception:
+            # A partially fetched season would silently truncate the output
+            writer.abort()
+            print(f"❌ Failed to fetch season {sid}; previous output left unchanged")
+            return False
+        if saved:
+            print(f"✅ Retrieved {saved} fixtures for season {sid}")
         else:
             print(f"⚠️  No fixtures retrieved for season {sid}")
+        total += saved
 
-    if not all_fixtures:
+    if not total:
+        writer.abort()
         print("❌ No fixtures retrieved from any season")
         return False
 
-    # Step 4: Parse data
-    print_step(4, "Parsing and processing data")
-    df = parse_fixtures(all_fixtures)
-
-    if df.empty:
-        print("❌ No fixtures could be parsed")
-        return False
-
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").reset_index(drop=True)
-
-    # Step 5: Save
-    print_step(5, "Saving results")
-    output_file = "danish_superliga_fixtures.csv"
-    df.to_csv(output_file, index=False)
-
-    print(f"✅ Saved {len(df)} fixtures to {output_file}")
+    output_files = writer.commit()
+    print(f"✅ Saved {total} fixtures to {', '.join(output_files)}")
     print("\nFirst 5 matches:")
-    print(df.head())
+    print(preview)
 
     print("\n" + "="*70)
     print("✨ Success! Data has been fetched and saved.")